@@ -6,14 +6,19 @@ Usage:
   build_vessel_tree.py --version
 
 Arguments:
-  <terminals.csv>	        Path to csv file with terminals coordinates.
+  <terminals.csv>	        Path to csv, npy or npz file with terminals coordinates.
   <output-dir>              Path where to store results.
 
 Options:
+  --roots <value>           Number of root vessels; first 2 * <value> rows are their inlets and outlets [default: 1]
+  --workers <value>         Number of worker processes used to grow a multi-root forest or optimize a batch.
+  --batch-size <value>      Number of terminals considered for joint insertion per network recalculation [default: 1]
+  --voxel-spacing <value>   Voxel size in mm; if given, tree is also saved as volume.npy with volume_geometry.json.
+  --voxel-mode <value>      Voxel content: occupancy, radius or index [default: occupancy]
   -h --help		            Show this screen.
   --version		            Show version.
 """
-import csv
+import json
 from pathlib import Path
 from typing import Any, Optional
 
@@ -26,19 +31,10 @@ from shapely.geometry import LineString, Point
 from shapely.ops import unary_union
 import trimesh.creation as tc
 
-from akle.cco import constants
+from akle.cco import forest
 from akle.cco import graph_operations
-from akle.cco import optimize
-from akle.cco.geometry import Point3D
-from akle.cco.vessel import Vessel
-
-
-def _get_coordinates(file_path: Path):
-    with open(file_path, newline='') as csvfile:
-        reader_object = csv.reader(csvfile, delimiter=',')
-        next(reader_object)
-        for x, y, z in reader_object:
-            yield float(x), float(y), float(z)
+from akle.cco import terminals_io
+from akle.cco import voxelize
 
 
 def _rotation_matrix_from_vectors(vec1, vec2):
@@ -57,22 +53,13 @@ def main(args: dict[str, Optional[Any]]):
     logger.debug(args)
 
     coordinates_file = Path(args['<terminals.csv>'])
-    points_generator = _get_coordinates(coordinates_file)
-    root_inlet = Point3D(*next(points_generator))
-    root_outlet = Point3D(*next(points_generator))
-
-    root_vessel = Vessel(inlet=root_inlet,
-                         outlet=root_outlet,
-                         flow=constants.TERMINAL_FLOW_MM3_PER_SEC,
-                         pressure_in=constants.PRESSURE_ENTRY_PASCAL,
-                         pressure_out=constants.PRESSURE_OUTLETS_PASCAL)
-
-    vascular_network = {'root': root_vessel,
-                        'tree': [root_vessel]}
+    num_roots = int(args['--roots'])
+    coordinates = terminals_io.load_terminals(coordinates_file)
+    batch_size = int(args['--batch-size'])
+    num_workers = int(args['--workers']) if args['--workers'] is not None else None
 
-    for terminal in points_generator:
-        logger.debug(f'Processing new terminal... {terminal}')
-        optimize.add_terminal(Point3D(*terminal), vascular_network)
+    roots = coordinates[:2 * num_roots].reshape(num_roots, 2, 3)
+    vascular_network = forest.grow_forest(roots, coordinates[2 * num_roots:], num_workers, batch_size)
 
     out_dir = Path(args['<output-dir>'])
 
@@ -82,40 +69,53 @@ def main(args: dict[str, Optional[Any]]):
                                segment=np.vstack([vessel.outlet.coordinates, vessel.inlet.coordinates]))
         cylinder.export(output_filename)
 
-    graph = graph_operations.create_vasculature_graph(vascular_network)
-    for node in graph.nodes:
-        if not node.is_parent:
-            path = nx.shortest_path(graph, vascular_network['root'], node)
-            coords = [vascular_network['root'].inlet.coordinates]
-            radii = []
-            len_accu = 0
-            for vessel in path:
-                coords += [vessel.outlet.coordinates]
-                radii += [np.array([len_accu, vessel.radius])]
-                len_accu += vessel.length
-            radii += [np.array([len_accu, 0.95 * radii[-1][1]])]
-            line = LineString(coords)
-            distances = np.arange(0, line.length, step=3)
-            points = [line.interpolate(d) for d in distances]
-            inter_coords = [np.array(p.coords) for p in points]
-            inter_coords += [coords[-1]]
-            coords = np.vstack(inter_coords)
-            df = pd.DataFrame(data=coords,
-                              columns=['x', 'y', 'z'])
-            output_filename = out_dir / f'branch_{path[-1].index:03d}.txt'
-            df.to_csv(output_filename, sep=',', index=False)
-
-            df = pd.DataFrame(data=np.array([coords[0, :],
-                                             coords[1, :] - coords[0, :]]),
-                              columns=['x', 'y', 'z'])
-            output_filename = out_dir / f'cylinder_{path[-1].index:03d}.txt'
-            df.to_csv(output_filename, sep=',', index=False)
-            radii = np.vstack(radii)
-            radii[:, 0] /= len_accu
-            output_filename = out_dir / f'radii_{path[-1].index:03d}.txt'
-            df = pd.DataFrame(data=radii,
-                              columns=['l', 'radius'])
-            df.to_csv(output_filename, sep=',', index=False)
+    if args['--voxel-spacing'] is not None:
+        spacing = float(args['--voxel-spacing'])
+        volume, origin = voxelize.voxelize_vessels(vascular_network['tree'],
+                                                   spacing=spacing,
+                                                   mode=args['--voxel-mode'],
+                                                   output_file=out_dir / 'volume.npy')
+        with open(out_dir / 'volume_geometry.json', 'w') as geometry_file:
+            json.dump({'origin': origin.tolist(),
+                       'spacing': spacing,
+                       'shape': list(volume.shape),
+                       'mode': args['--voxel-mode']}, geometry_file, indent=2)
+
+    for root in vascular_network['roots']:
+        graph = graph_operations.create_vasculature_graph({'root': root})
+        for node in graph.nodes:
+            if not node.is_parent:
+                path = nx.shortest_path(graph, root, node)
+                coords = [root.inlet.coordinates]
+                radii = []
+                len_accu = 0
+                for vessel in path:
+                    coords += [vessel.outlet.coordinates]
+                    radii += [np.array([len_accu, vessel.radius])]
+                    len_accu += vessel.length
+                radii += [np.array([len_accu, 0.95 * radii[-1][1]])]
+                line = LineString(coords)
+                distances = np.arange(0, line.length, step=3)
+                points = [line.interpolate(d) for d in distances]
+                inter_coords = [np.array(p.coords) for p in points]
+                inter_coords += [coords[-1]]
+                coords = np.vstack(inter_coords)
+                df = pd.DataFrame(data=coords,
+                                  columns=['x', 'y', 'z'])
+                output_filename = out_dir / f'branch_{path[-1].index:03d}.txt'
+                df.to_csv(output_filename, sep=',', index=False)
+
+                df = pd.DataFrame(data=np.array([coords[0, :],
+                                                 coords[1, :] - coords[0, :]]),
+                                  columns=['x', 'y', 'z'])
+                output_filename = out_dir / f'cylinder_{path[-1].index:03d}.txt'
+                df.to_csv(output_filename, sep=',', index=False)
+                radii = np.vstack(radii)
+                radii[:, 0] /= len_accu
+                output_filename = out_dir / f'radii_{path[-1].index:03d}.txt'
+                df = pd.DataFrame(data=radii,
+                                  columns=['l', 'radius'])
+                df.to_csv(output_filename, sep=',', index=False)
 
 
 if __name__ == '__main__':
@@ -6,7 +6,7 @@ Usage:
   sample_vessel_terminals.py --version
 
 Arguments:
-  <terminals.csv>       Path to output csv file with terminals coordinates.
+  <terminals.csv>       Path to output csv, npy or npz file with terminals coordinates.
 
 Options:
   --radius <value>      Radius of the spherical perfusion volume in mm.
@@ -20,7 +20,8 @@ from typing import Any, Optional
 from docopt import docopt
 from loguru import logger
 import numpy as np
-import pandas as pd
+
+from akle.cco import terminals_io
 
 
 def main(args: dict[str, Optional[Any]]):
@@ -39,10 +40,8 @@ def main(args: dict[str, Optional[Any]]):
 
     terminals = np.concatenate([xx[:, None], yy[:, None], zz[:, None]], axis=1)
     terminals = np.vstack([np.array([-perfusion_volume_radius, 0, 0]), terminals])
-    df = pd.DataFrame(data=terminals,
-                      columns=['x', 'y', 'z'])
-    output_filename = args['<terminals.csv>']
-    df.to_csv(output_filename, sep=',', index=False)
+    output_filename = Path(args['<terminals.csv>'])
+    terminals_io.save_terminals(output_filename, terminals)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,121 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from loguru import logger
+import numpy as np
+
+from akle.cco import constants
+from akle.cco import optimize
+from akle.cco.geometry import distances_to_segments, Point3D
+from akle.cco.vessel import Vessel
+
+
+def create_root_vessel(inlet: Point3D, outlet: Point3D) -> Vessel:
+    return Vessel(inlet=inlet,
+                  outlet=outlet,
+                  flow=constants.TERMINAL_FLOW_MM3_PER_SEC,
+                  pressure_in=constants.PRESSURE_ENTRY_PASCAL,
+                  pressure_out=constants.PRESSURE_OUTLETS_PASCAL)
+
+
+def assign_terminals_to_roots(terminals: np.ndarray, roots: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """Labels every terminal with index of the nearest root segment.
+
+    Roots are given as (num_roots, 2, 3) array of inlet and outlet coordinates. Terminals are
+    processed in chunks of chunk_size rows to bound memory of the distance computation.
+    """
+    labels = np.empty(len(terminals), dtype=int)
+    for start in range(0, len(terminals), chunk_size):
+        chunk = terminals[start:start + chunk_size]
+        distances = distances_to_segments(chunk, roots[:, 0, :], roots[:, 1, :])
+        labels[start:start + len(chunk)] = np.argmin(distances, axis=1)
+    return labels
+
+
+def _flatten_tree(root: Vessel) -> dict[str, np.ndarray]:
+    """Stores tree as arrays in preorder, son before daughter; 'parent' holds parent row or -1 for root."""
+    rows = []
+    stack = [(root, -1)]
+    while stack:
+        vessel, parent_row = stack.pop()
+        rows += [(vessel, parent_row)]
+        if vessel.is_parent:
+            stack += [(vessel.daughter, len(rows) - 1), (vessel.son, len(rows) - 1)]
+    vessels = [vessel for vessel, _ in rows]
+    return {'inlet': np.array([vessel.inlet.coordinates for vessel in vessels]),
+            'outlet': np.array([vessel.outlet.coordinates for vessel in vessels]),
+            'radius': np.array([vessel.radius for vessel in vessels]),
+            'flow': np.array([vessel.flow for vessel in vessels]),
+            'pressure_in': np.array([vessel.pressure_in for vessel in vessels]),
+            'pressure_out': np.array([vessel.pressure_out for vessel in vessels]),
+            'parent': np.array([parent_row for _, parent_row in rows], dtype=int)}
+
+
+def _rebuild_tree(arrays: dict[str, np.ndarray]) -> list[Vessel]:
+    vessels = []
+    children = [[] for _ in range(len(arrays['parent']))]
+    for row, parent_row in enumerate(arrays['parent']):
+        vessel = Vessel(inlet=Point3D(*arrays['inlet'][row]),
+                        outlet=Point3D(*arrays['outlet'][row]),
+                        flow=arrays['flow'][row],
+                        pressure_in=arrays['pressure_in'][row],
+                        pressure_out=arrays['pressure_out'][row],
+                        parent=vessels[parent_row] if parent_row >= 0 else None)
+        vessel.radius = arrays['radius'][row]
+        vessels += [vessel]
+        if parent_row >= 0:
+            children[parent_row] += [vessel]
+    for vessel, vessel_children in zip(vessels, children):
+        if vessel_children:
+            vessel.set_children(*vessel_children)
+    return vessels
+
+
+def grow_tree(root: np.ndarray,
+              terminals: np.ndarray,
+              batch_size: int = 1,
+              num_workers: Optional[int] = None) -> dict[str, Vessel | list[Vessel]]:
+    """Grows single tree from (2, 3) root inlet and outlet, in batches if batch_size is above one."""
+    root_vessel = create_root_vessel(Point3D(*root[0]), Point3D(*root[1]))
+    vascular_network = {'root': root_vessel,
+                        'tree': [root_vessel]}
+    if batch_size > 1:
+        optimize.add_terminals_in_batches(terminals, vascular_network, batch_size, num_workers)
+    else:
+        for terminal in terminals:
+            logger.debug(f'Processing new terminal... {terminal}')
+            optimize.add_terminal(Point3D(*terminal), vascular_network)
+    return vascular_network
+
+
+def _grow_territory(root: np.ndarray, terminals: np.ndarray, batch_size: int) -> dict[str, np.ndarray]:
+    return _flatten_tree(grow_tree(root, terminals, batch_size)['root'])
+
+
+def grow_forest(roots: np.ndarray,
+                terminals: np.ndarray,
+                num_workers: Optional[int] = None,
+                batch_size: int = 1) -> dict[str, list[Vessel]]:
+    """Grows independent tree for each root territory and merges them into single forest.
+
+    Every territory is grown in a separate worker process, which sends the tree back as flat
+    arrays. Trees are rebuilt here, so merged vessels get indices unique across the forest.
+    With batch_size above one, territories insert terminals in batches within their worker.
+    Single root is grown in this process, with num_workers used for batch optimization.
+    """
+    if len(roots) == 1:
+        vascular_network = grow_tree(roots[0], terminals, batch_size, num_workers)
+        return {'roots': [vascular_network['root']],
+                'tree': vascular_network['tree']}
+
+    labels = assign_terminals_to_roots(terminals, roots)
+    territories = [terminals[labels == i] for i in range(len(roots))]
+    for i, territory in enumerate(territories):
+        logger.info(f'Root {i} perfuses territory of {len(territory)} terminals.')
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        flat_trees = executor.map(_grow_territory, roots, territories, [batch_size] * len(roots))
+        trees = [_rebuild_tree(arrays) for arrays in flat_trees]
+
+    return {'roots': [tree[0] for tree in trees],
+            'tree': [vessel for tree in trees for vessel in tree]}
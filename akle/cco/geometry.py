@@ -2,6 +2,18 @@ import numpy as np
 import sympy
 
 
+def distances_to_segments(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Returns (num_points, num_segments) matrix of point-to-segment distances."""
+    direction = ends - starts
+    squared_length = np.einsum('ij,ij->i', direction, direction)
+    squared_length = np.where(squared_length > 0, squared_length, 1.0)
+    offsets = points[:, None, :] - starts[None, :, :]
+    t = np.einsum('nsk,sk->ns', offsets, direction) / squared_length
+    t = np.clip(t, 0.0, 1.0)
+    closest = starts[None, :, :] + t[..., None] * direction[None, :, :]
+    return np.linalg.norm(points[:, None, :] - closest, axis=-1)
+
+
 class Point3D:
     def __init__(self, x: float, y: float, z: float):
         self.x = x
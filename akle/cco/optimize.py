@@ -1,10 +1,13 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
 from copy import copy
+from typing import Optional
 
 from loguru import logger
+import numpy as np
 
 from akle.cco import constants
 from akle.cco.bifurcation import Bifurcation
-from akle.cco.geometry import Point3D, Segment3D
+from akle.cco.geometry import distances_to_segments, Point3D, Segment3D
 from akle.cco.vessel import pressure_drop_on_segment, radius_from_pressure_drop, Vessel
 
 
@@ -109,23 +112,14 @@ def optimize_subtree(top_vessel: Vessel, vessels: list[Vessel]):
             top_vessel.pressure_in = pb_in
 
 
-def add_terminal(new_terminal: Point3D, vascular_network: dict[str, Vessel | list[Vessel]]):
-    old_parent = get_nearest_vessel_to_point(new_terminal, vascular_network['tree'])
-    logger.info(f'Found nearest vessel with index {old_parent.index}. Optimizing bifurcation point...')
-
-    b = Bifurcation(bifurcating_vessel=old_parent,
-                    new_terminal_point=new_terminal)
-    b.optimize_bifurcation(num_iterations=100)
-
-    logger.info('Bifurcation point optimized. Replacing parent vessel with new bifurcation...')
-
-    new_son = copy(b.son)
+def _insert_bifurcation(old_parent: Vessel,
+                        new_parent: Vessel,
+                        new_son: Vessel,
+                        new_daughter: Vessel,
+                        vascular_network: dict[str, Vessel | list[Vessel]]):
     if old_parent.is_parent:
         new_son.set_children(old_parent.son, old_parent.daughter)
 
-    new_daughter = copy(b.daughter)
-    new_parent = copy(b.parent)
-
     new_parent.set_children(new_son, new_daughter)
 
     if old_parent.has_parent:
@@ -138,14 +132,16 @@ def add_terminal(new_terminal: Point3D, vascular_network: dict[str, Vessel | lis
         vascular_network['root'] = new_parent
         logger.info('Changed root to new vessel.')
 
-    vascular_network['root'].accumulate_flow()
     vascular_network['tree'].remove(old_parent)
     old_parent.delete_vessel(False)
 
     vascular_network['tree'] += [new_parent]
     vascular_network['tree'] += [new_son]
     vascular_network['tree'] += [new_daughter]
-    del b
+
+
+def _recalculate_network(vascular_network: dict[str, Vessel | list[Vessel]]):
+    vascular_network['root'].accumulate_flow()
 
     logger.info('Recalculating all network radii and pressures...')
 
@@ -160,3 +156,114 @@ def add_terminal(new_terminal: Point3D, vascular_network: dict[str, Vessel | lis
     logger.info('Globally scaling radii...')
 
     scale_radii_and_update_pressures_down_subtree(vascular_network['root'], global_factor)
+
+
+def _optimized_bifurcation(bifurcating_vessel: Vessel, new_terminal: Point3D) -> tuple[Vessel, Vessel, Vessel]:
+    b = Bifurcation(bifurcating_vessel=bifurcating_vessel,
+                    new_terminal_point=new_terminal)
+    b.optimize_bifurcation(num_iterations=100)
+    new_vessels = copy(b.parent), copy(b.son), copy(b.daughter)
+    del b
+    return new_vessels
+
+
+def _detached_copy(vessel: Vessel) -> Vessel:
+    """Copies vessel without links to the rest of the tree, except for a childless copy of its parent."""
+    detached = copy(vessel)
+    detached.son = None
+    detached.daughter = None
+    detached.is_parent = False
+    if vessel.has_parent:
+        detached.parent = copy(vessel.parent)
+        detached.parent.clear_parent()
+        detached.parent.son = None
+        detached.parent.daughter = None
+        detached.parent.is_parent = False
+    return detached
+
+
+def _select_independent_terminals(new_terminals: np.ndarray,
+                                  vessels: list[Vessel]) -> tuple[list[tuple[Vessel, int]], np.ndarray]:
+    """Pairs terminal rows with their nearest vessels so that no two chosen vessels are equal or adjacent.
+
+    Rows of terminals whose nearest vessel conflicts with an earlier choice are returned as deferred.
+    Nearest vessel is searched one terminal at a time, so memory does not grow with batch size.
+    """
+    inlets = np.array([vessel.inlet.coordinates for vessel in vessels])
+    outlets = np.array([vessel.outlet.coordinates for vessel in vessels])
+
+    selected = []
+    deferred = []
+    locked = set()
+    for row, terminal in enumerate(new_terminals):
+        distances = distances_to_segments(terminal[None, :], inlets, outlets)[0]
+        target = vessels[int(np.argmin(distances))]
+        if target in locked:
+            deferred += [row]
+            continue
+        selected += [(target, row)]
+        locked |= {target, target.parent, target.son, target.daughter} - {None}
+    return selected, np.array(deferred, dtype=int)
+
+
+def add_terminal(new_terminal: Point3D, vascular_network: dict[str, Vessel | list[Vessel]]):
+    old_parent = get_nearest_vessel_to_point(new_terminal, vascular_network['tree'])
+    logger.info(f'Found nearest vessel with index {old_parent.index}. Optimizing bifurcation point...')
+
+    new_parent, new_son, new_daughter = _optimized_bifurcation(old_parent, new_terminal)
+
+    logger.info('Bifurcation point optimized. Replacing parent vessel with new bifurcation...')
+
+    _insert_bifurcation(old_parent, new_parent, new_son, new_daughter, vascular_network)
+
+    _recalculate_network(vascular_network)
+
+
+def add_terminals(new_terminals: np.ndarray,
+                  vascular_network: dict[str, Vessel | list[Vessel]],
+                  executor: Optional[Executor] = None) -> np.ndarray:
+    """Inserts mutually independent subset of (N, 3) terminals and recalculates network only once.
+
+    Bifurcations are optimized in executor if given. Returns rows of terminals deferred due to conflicts.
+    """
+    selected, deferred = _select_independent_terminals(new_terminals, vascular_network['tree'])
+    logger.info(f'Inserting batch of {len(selected)} terminals, {len(deferred)} deferred...')
+
+    old_parents = [old_parent for old_parent, _ in selected]
+    terminals = [Point3D(*new_terminals[row]) for _, row in selected]
+    if executor is None:
+        bifurcations = list(map(_optimized_bifurcation, old_parents, terminals))
+    else:
+        bifurcations = list(executor.map(_optimized_bifurcation,
+                                         [_detached_copy(old_parent) for old_parent in old_parents],
+                                         terminals))
+
+    for old_parent, new_vessels in zip(old_parents, bifurcations):
+        if executor is not None:
+            for vessel in new_vessels:
+                vessel.index = Vessel.count
+                Vessel.count += 1
+        _insert_bifurcation(old_parent, *new_vessels, vascular_network)
+
+    _recalculate_network(vascular_network)
+
+    return deferred
+
+
+def add_terminals_in_batches(new_terminals: np.ndarray,
+                             vascular_network: dict[str, Vessel | list[Vessel]],
+                             batch_size: int,
+                             num_workers: Optional[int] = None):
+    """Inserts (N, 3) terminals in batches; terminals deferred by a batch lead the next one."""
+    deferred = np.empty(0, dtype=int)
+    start = 0
+    executor = ProcessPoolExecutor(max_workers=num_workers) if num_workers is not None and num_workers > 1 else None
+    try:
+        while start < len(new_terminals) or len(deferred):
+            stop = min(len(new_terminals), start + batch_size - len(deferred))
+            rows = np.concatenate([deferred, np.arange(start, stop)])
+            deferred = rows[add_terminals(new_terminals[rows], vascular_network, executor)]
+            start = stop
+    finally:
+        if executor is not None:
+            executor.shutdown()
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TERMINALS_NPZ_KEY = 'terminals'
+
+
+def _read_npz(file_path: Path) -> np.ndarray:
+    with np.load(file_path) as archive:
+        if TERMINALS_NPZ_KEY in archive.files:
+            return archive[TERMINALS_NPZ_KEY]
+        if len(archive.files) == 1:
+            return archive[archive.files[0]]
+        raise ValueError(f'Expected array under key {TERMINALS_NPZ_KEY!r} in {file_path}, found {archive.files}.')
+
+
+def load_terminals(file_path: Path) -> np.ndarray:
+    """Loads C-contiguous float64 (num_points, 3) array of coordinates from .csv, .npy or .npz file.
+
+    .npy files already stored as C-ordered float64 are memory-mapped instead of being read into memory.
+    """
+    suffix = file_path.suffix.lower()
+    if suffix == '.npy':
+        coordinates = np.load(file_path, mmap_mode='r')
+        if coordinates.dtype != np.float64 or not coordinates.flags.c_contiguous:
+            coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+    elif suffix == '.npz':
+        coordinates = np.ascontiguousarray(_read_npz(file_path), dtype=np.float64)
+    else:
+        coordinates = np.ascontiguousarray(pd.read_csv(file_path, sep=',').to_numpy(), dtype=np.float64)
+
+    if coordinates.ndim != 2 or coordinates.shape[1] != 3:
+        raise ValueError(f'Expected (N, 3) array of terminal coordinates in {file_path}, got {coordinates.shape}.')
+    return coordinates
+
+
+def save_terminals(file_path: Path, coordinates: np.ndarray):
+    suffix = file_path.suffix.lower()
+    if suffix == '.npy':
+        np.save(file_path, coordinates)
+    elif suffix == '.npz':
+        np.savez(file_path, **{TERMINALS_NPZ_KEY: coordinates})
+    else:
+        df = pd.DataFrame(data=coordinates,
+                          columns=['x', 'y', 'z'])
+        df.to_csv(file_path, sep=',', index=False)
@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+import numpy as np
+
+from akle.cco.vessel import Vessel
+
+VOXEL_MODES = ('occupancy', 'radius', 'index')
+
+_MODE_DTYPES = {'occupancy': np.uint8,
+                'radius': np.float32,
+                'index': np.int32}
+
+
+def _vessel_arrays(vessels: list[Vessel]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    inlets = np.array([vessel.inlet.coordinates for vessel in vessels], dtype=float)
+    outlets = np.array([vessel.outlet.coordinates for vessel in vessels], dtype=float)
+    radii = np.array([vessel.radius for vessel in vessels], dtype=float)
+    indices = np.array([vessel.index for vessel in vessels], dtype=int)
+    return inlets, outlets, radii, indices
+
+
+def _capsule_mask(inlet: np.ndarray,
+                  outlet: np.ndarray,
+                  radius: float,
+                  xs: np.ndarray,
+                  ys: np.ndarray,
+                  zs: np.ndarray) -> np.ndarray:
+    direction = outlet - inlet
+    squared_length = max(float(np.dot(direction, direction)), np.finfo(float).tiny)
+    ox = (xs - inlet[0])[:, None, None]
+    oy = (ys - inlet[1])[None, :, None]
+    oz = (zs - inlet[2])[None, None, :]
+    t = (ox * direction[0] + oy * direction[1] + oz * direction[2]) / squared_length
+    t = np.clip(t, 0.0, 1.0)
+    dx = ox - t * direction[0]
+    dy = oy - t * direction[1]
+    dz = oz - t * direction[2]
+    return dx * dx + dy * dy + dz * dz <= radius * radius
+
+
+def voxelize_vessels(vessels: list[Vessel],
+                     spacing: float,
+                     mode: str = 'occupancy',
+                     origin: Optional[np.ndarray] = None,
+                     shape: Optional[tuple[int, int, int]] = None,
+                     output_file: Optional[Path] = None,
+                     chunk_voxels: int = 2 ** 22) -> tuple[np.ndarray, np.ndarray]:
+    """Rasterizes vessels as capsules onto regular grid with voxel centers at origin + i * spacing.
+
+    Mode selects grid content: 'occupancy' (0/1), 'radius' (largest covering vessel radius)
+    or 'index' (covering vessel index, -1 for background). Each vessel is tested only against
+    voxels in its bounding box, processed in slabs of at most chunk_voxels voxels. If output_file
+    is given, grid is stored as memory-mapped .npy file. Returns grid and origin used.
+    """
+    if mode not in VOXEL_MODES:
+        raise ValueError(f'Unknown voxelization mode {mode}, expected one of {VOXEL_MODES}.')
+
+    inlets, outlets, radii, indices = _vessel_arrays(vessels)
+    lower = np.minimum(inlets, outlets) - radii[:, None]
+    upper = np.maximum(inlets, outlets) + radii[:, None]
+
+    if origin is None:
+        origin = lower.min(axis=0)
+    origin = np.asarray(origin, dtype=float)
+    if shape is None:
+        shape = tuple(int(n) for n in np.ceil((upper.max(axis=0) - origin) / spacing).astype(int) + 1)
+    shape_array = np.array(shape)
+
+    dtype = _MODE_DTYPES[mode]
+    if output_file is not None:
+        volume = np.lib.format.open_memmap(output_file, mode='w+', dtype=dtype, shape=shape)
+    else:
+        volume = np.zeros(shape, dtype=dtype)
+    if mode == 'index':
+        volume[...] = -1
+
+    logger.info(f'Voxelizing {len(vessels)} vessels into grid of shape {shape}...')
+
+    box_lo = np.clip(np.floor((lower - origin) / spacing).astype(int), 0, shape_array)
+    box_hi = np.clip(np.ceil((upper - origin) / spacing).astype(int) + 1, 0, shape_array)
+
+    for inlet, outlet, radius, index, lo, hi in zip(inlets, outlets, radii, indices, box_lo, box_hi):
+        if np.any(hi <= lo):
+            continue
+        ys = origin[1] + np.arange(lo[1], hi[1]) * spacing
+        zs = origin[2] + np.arange(lo[2], hi[2]) * spacing
+        slab = max(1, chunk_voxels // (len(ys) * len(zs)))
+        for x0 in range(lo[0], hi[0], slab):
+            x1 = min(x0 + slab, hi[0])
+            xs = origin[0] + np.arange(x0, x1) * spacing
+            mask = _capsule_mask(inlet, outlet, radius, xs, ys, zs)
+            block = volume[x0:x1, lo[1]:hi[1], lo[2]:hi[2]]
+            if mode == 'occupancy':
+                block[mask] = 1
+            elif mode == 'radius':
+                block[mask] = np.maximum(block[mask], radius)
+            else:
+                block[mask] = index
+
+    if isinstance(volume, np.memmap):
+        volume.flush()
+
+    return volume, origin
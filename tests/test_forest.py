@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from akle.cco import constants
+from akle.cco import forest
+
+ROOTS = np.array([[[-20.0, 0.0, 0.0], [-12.0, 0.0, 0.0]],
+                  [[20.0, 0.0, 0.0], [12.0, 0.0, 0.0]]])
+
+TERMINALS = np.array([[-8.0, 5.0, 1.0],
+                      [-7.0, -4.0, -2.0],
+                      [-10.0, 2.0, 6.0],
+                      [8.0, 5.0, -1.0],
+                      [7.0, -6.0, 2.0],
+                      [10.0, 1.0, -5.0]])
+
+
+def _assert_linked(root):
+    stack = [root]
+    while stack:
+        vessel = stack.pop()
+        if vessel.is_parent:
+            assert vessel.son.parent is vessel
+            assert vessel.daughter.parent is vessel
+            assert vessel.son.has_parent and vessel.daughter.has_parent
+            stack += [vessel.son, vessel.daughter]
+
+
+def test_assign_terminals_to_roots_is_independent_of_chunk_size():
+    labels = forest.assign_terminals_to_roots(TERMINALS, ROOTS)
+
+    np.testing.assert_array_equal(labels, [0, 0, 0, 1, 1, 1])
+    np.testing.assert_array_equal(forest.assign_terminals_to_roots(TERMINALS, ROOTS, chunk_size=4), labels)
+
+
+def test_flat_tree_round_trip_preserves_links_flows_and_radii():
+    vascular_network = forest.grow_tree(ROOTS[0], TERMINALS[:3])
+
+    rebuilt = forest._rebuild_tree(forest._flatten_tree(vascular_network['root']))
+
+    assert len(rebuilt) == len(vascular_network['tree'])
+    assert not rebuilt[0].has_parent
+    _assert_linked(rebuilt[0])
+    original = forest._flatten_tree(vascular_network['root'])
+    for key, values in forest._flatten_tree(rebuilt[0]).items():
+        np.testing.assert_allclose(values, original[key])
+
+
+def test_grow_forest_merges_territories_with_unique_indices():
+    vascular_forest = forest.grow_forest(ROOTS, TERMINALS, num_workers=2)
+
+    tree = vascular_forest['tree']
+    assert len(vascular_forest['roots']) == len(ROOTS)
+    assert len(tree) == len(ROOTS) + 2 * len(TERMINALS)
+    assert len({vessel.index for vessel in tree}) == len(tree)
+    for root in vascular_forest['roots']:
+        assert not root.has_parent
+        _assert_linked(root)
+        assert root.flow == pytest.approx(4 * constants.TERMINAL_FLOW_MM3_PER_SEC)
+    for vessel in tree:
+        if vessel.is_parent:
+            assert vessel.flow == pytest.approx(vessel.son.flow + vessel.daughter.flow)
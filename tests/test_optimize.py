@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from akle.cco import constants
+from akle.cco import forest
+from akle.cco import optimize
+from akle.cco.geometry import Point3D
+
+TERMINALS = np.array([[4.0, 6.0, 1.0],
+                      [5.0, -6.0, -1.0],
+                      [9.0, 2.0, 3.0],
+                      [8.0, -3.0, -4.0],
+                      [12.0, 5.0, -2.0],
+                      [13.0, -5.0, 2.0]])
+
+
+def _create_network():
+    root = forest.create_root_vessel(Point3D(-10.0, 0.0, 0.0), Point3D(0.0, 0.0, 0.0))
+    return {'root': root,
+            'tree': [root]}
+
+
+def _reachable_vessels(root):
+    reachable = []
+    stack = [root]
+    while stack:
+        vessel = stack.pop()
+        reachable += [vessel]
+        if vessel.is_parent:
+            stack += [vessel.son, vessel.daughter]
+    return reachable
+
+
+def _assert_consistent(vascular_network):
+    tree = vascular_network['tree']
+    reachable = _reachable_vessels(vascular_network['root'])
+    assert len(reachable) == len(tree)
+    assert set(reachable) == set(tree)
+    assert len({vessel.index for vessel in tree}) == len(tree)
+    assert not vascular_network['root'].has_parent
+
+    for vessel in tree:
+        assert np.isfinite(vessel.radius)
+        if vessel.is_parent:
+            assert vessel.son.parent is vessel
+            assert vessel.daughter.parent is vessel
+            assert vessel.flow == pytest.approx(vessel.son.flow + vessel.daughter.flow)
+            assert vessel.son.pressure_in == pytest.approx(vessel.pressure_out)
+            assert vessel.daughter.pressure_in == pytest.approx(vessel.pressure_out)
+
+
+@pytest.mark.parametrize('num_workers', [None, 2])
+def test_batched_insertion_keeps_network_consistent_with_fewer_recalculations(num_workers, monkeypatch):
+    sequential_network = _create_network()
+    for terminal in TERMINALS:
+        optimize.add_terminal(Point3D(*terminal), sequential_network)
+
+    recalculations = []
+    recalculate_network = optimize._recalculate_network
+
+    def _counting_recalculate_network(vascular_network):
+        recalculations.append(vascular_network)
+        recalculate_network(vascular_network)
+
+    monkeypatch.setattr(optimize, '_recalculate_network', _counting_recalculate_network)
+
+    batched_network = _create_network()
+    optimize.add_terminals_in_batches(TERMINALS, batched_network, batch_size=3, num_workers=num_workers)
+
+    _assert_consistent(sequential_network)
+    _assert_consistent(batched_network)
+
+    assert len(recalculations) < len(TERMINALS)
+    assert len(batched_network['tree']) == len(sequential_network['tree'])
+    num_terminals = len(TERMINALS) + 1
+    assert batched_network['root'].flow == pytest.approx(num_terminals * constants.TERMINAL_FLOW_MM3_PER_SEC)
+
+
+def test_conflicting_terminals_are_deferred():
+    vascular_network = _create_network()
+    deferred = optimize.add_terminals(TERMINALS[:2], vascular_network)
+
+    np.testing.assert_array_equal(deferred, [1])
+    assert len(vascular_network['tree']) == 3
+    _assert_consistent(vascular_network)
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from akle.cco import terminals_io
+from akle.cco.apps import sample_vessel_terminals
+
+
+def _sample_terminals(output_file: Path):
+    np.random.seed(3)
+    sample_vessel_terminals.main({'--count': '20',
+                                  '--radius': '10',
+                                  '<terminals.csv>': str(output_file)})
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.npy', '.npz'])
+def test_sampled_terminals_round_trip(tmp_path, suffix):
+    reference_file = tmp_path / 'reference.npy'
+    _sample_terminals(reference_file)
+    output_file = tmp_path / f'terminals{suffix}'
+    _sample_terminals(output_file)
+
+    coordinates = terminals_io.load_terminals(output_file)
+
+    assert coordinates.shape == (21, 3)
+    assert coordinates.dtype == np.float64
+    assert coordinates.flags.c_contiguous
+    np.testing.assert_allclose(coordinates, np.load(reference_file))
+
+
+def test_float64_npy_stays_memory_mapped(tmp_path):
+    output_file = tmp_path / 'terminals.npy'
+    _sample_terminals(output_file)
+
+    assert isinstance(terminals_io.load_terminals(output_file), np.memmap)
+
+
+def test_npy_of_other_dtype_is_converted_to_float64(tmp_path):
+    output_file = tmp_path / 'terminals.npy'
+    np.save(output_file, np.arange(12, dtype=np.int32).reshape(4, 3))
+
+    coordinates = terminals_io.load_terminals(output_file)
+
+    assert coordinates.dtype == np.float64
+    np.testing.assert_array_equal(coordinates, np.arange(12).reshape(4, 3))
+
+
+def test_npz_with_single_unnamed_array_is_loaded(tmp_path):
+    output_file = tmp_path / 'terminals.npz'
+    np.savez(output_file, np.ones((4, 3), dtype=np.float32))
+
+    coordinates = terminals_io.load_terminals(output_file)
+
+    assert coordinates.dtype == np.float64
+    np.testing.assert_array_equal(coordinates, np.ones((4, 3)))
+
+
+def test_npz_with_several_arrays_and_no_terminals_key_is_rejected(tmp_path):
+    output_file = tmp_path / 'terminals.npz'
+    np.savez(output_file, a=np.ones((4, 3)), b=np.ones((2, 3)))
+
+    with pytest.raises(ValueError, match=terminals_io.TERMINALS_NPZ_KEY):
+        terminals_io.load_terminals(output_file)
+
+
+def test_coordinates_of_wrong_shape_are_rejected(tmp_path):
+    output_file = tmp_path / 'terminals.npy'
+    np.save(output_file, np.ones((4, 2)))
+
+    with pytest.raises(ValueError, match='Expected \\(N, 3\\)'):
+        terminals_io.load_terminals(output_file)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from akle.cco import voxelize
+from akle.cco.geometry import distances_to_segments, Point3D
+from akle.cco.vessel import Vessel
+
+SPACING = 0.37
+
+
+def _random_vessels(num_vessels: int = 4):
+    rng = np.random.default_rng(7)
+    vessels = []
+    for _ in range(num_vessels):
+        inlet, outlet = rng.uniform(-5.0, 5.0, (2, 3))
+        vessel = Vessel(inlet=Point3D(*inlet),
+                        outlet=Point3D(*outlet),
+                        flow=1.0,
+                        pressure_in=2.0,
+                        pressure_out=1.0)
+        vessel.radius = rng.uniform(0.5, 1.5)
+        vessels += [vessel]
+    return vessels
+
+
+def _brute_force_coverage(vessels, origin, shape):
+    grid = np.stack(np.meshgrid(*[np.arange(n) for n in shape], indexing='ij'), axis=-1)
+    centers = origin + grid.reshape(-1, 3) * SPACING
+    inlets = np.array([vessel.inlet.coordinates for vessel in vessels])
+    outlets = np.array([vessel.outlet.coordinates for vessel in vessels])
+    radii = np.array([vessel.radius for vessel in vessels])
+    covered = distances_to_segments(centers, inlets, outlets) <= radii
+    return covered.reshape(*shape, len(vessels)), radii
+
+
+@pytest.mark.parametrize('mode', voxelize.VOXEL_MODES)
+def test_voxelization_matches_brute_force_capsule_test(mode):
+    vessels = _random_vessels()
+    volume, origin = voxelize.voxelize_vessels(vessels, SPACING, mode=mode, chunk_voxels=500)
+
+    covered, radii = _brute_force_coverage(vessels, origin, volume.shape)
+    if mode == 'occupancy':
+        np.testing.assert_array_equal(volume, covered.any(axis=-1))
+    elif mode == 'radius':
+        expected = np.where(covered, radii, 0.0).max(axis=-1)
+        np.testing.assert_allclose(volume, expected, rtol=1e-6)
+    else:
+        indices = np.array([vessel.index for vessel in vessels])
+        np.testing.assert_array_equal(volume == -1, ~covered.any(axis=-1))
+        labelled = volume != -1
+        position = np.searchsorted(indices, volume[labelled])
+        assert covered[labelled, position].all()
+
+
+def test_explicit_origin_and_shape_clip_vessels():
+    vessels = _random_vessels()
+    origin = np.array([-1.0, -1.0, -2.0])
+    shape = (8, 8, 8)
+
+    volume, returned_origin = voxelize.voxelize_vessels(vessels, SPACING, origin=origin, shape=shape)
+
+    assert volume.shape == shape
+    assert volume.any()
+    np.testing.assert_array_equal(returned_origin, origin)
+    covered, _ = _brute_force_coverage(vessels, origin, shape)
+    np.testing.assert_array_equal(volume, covered.any(axis=-1))
+
+
+def test_memory_mapped_output_is_written_to_file(tmp_path):
+    vessels = _random_vessels()
+    output_file = tmp_path / 'volume.npy'
+
+    volume, _ = voxelize.voxelize_vessels(vessels, SPACING, mode='index', output_file=output_file)
+
+    assert isinstance(volume, np.memmap)
+    np.testing.assert_array_equal(np.load(output_file), volume)
+    assert (np.load(output_file) == -1).any()